@@ -1,20 +1,158 @@
+import atexit
+import functools
+import hashlib
 import logging
 import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Mapping, NamedTuple
+from urllib.parse import urlsplit
 from smolagent import tool
-import google.generativeai as genai
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# orjson is optional; it decodes the larger GitHub payloads several times faster.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# httpx with its http2 extra is optional too; when present the GitHub API
+# calls share one multiplexed HTTP/2 connection instead of a socket each.
+try:
+    import h2  # noqa: F401  (required by httpx for http2=True)
+    import httpx
+except ImportError:
+    httpx = None
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 
+# One pooled session for every tool so repeated calls to the same host reuse
+# the TCP/TLS connection instead of handshaking on each request.
+_SESSION = requests.Session()
+_SESSION.headers.update({"User-Agent": "qagent"})
+_ADAPTER = HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=20,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+_SESSION.mount("http://", _ADAPTER)
+_SESSION.mount("https://", _ADAPTER)
+# GitHub rate-limit responses must reach _github_request on the first try:
+# retrying a 429 (and sleeping its Retry-After) only spends more budget.
+_SESSION.mount(
+    "https://api.github.com/",
+    HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[500, 502, 503, 504],
+            raise_on_status=False,
+            respect_retry_after_header=False,
+        ),
+    ),
+)
+atexit.register(_SESSION.close)
+
+_GITHUB_CLIENT = None
+if httpx is not None:
+    _GITHUB_CLIENT = httpx.Client(
+        transport=httpx.HTTPTransport(
+            http2=True,
+            retries=3,
+            limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+        ),
+        headers={"User-Agent": "qagent"},
+        timeout=10.0,
+        # requests follows redirects, e.g. for renamed or transferred repos
+        follow_redirects=True,
+    )
+    atexit.register(_GITHUB_CLIENT.close)
+    # httpx logs every request at INFO, which the basicConfig above would print
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+# Real LICENSE files are a few KB; anything past this is not worth reading.
+_MAX_LICENSE_BYTES = 1 << 20
+
+_SPDX_CACHE_DIR = Path.home() / ".cache" / "qagent" / "spdx"
+# SPDX identifiers are letters, digits, '.', '-' and '+'; anything else is
+# never used as a cache file name.
+_SPDX_ID_RE = re.compile(r"^[A-Za-z0-9.+-]+$")
+
+# Upper bound on in-flight requests for the batch helpers; kept below the
+# session's pool size so concurrent workers never wait on a free connection.
+_BATCH_WORKERS = 8
+
 
-APPROVED_LICENSES = [
+def _map_concurrently(func, items):
+    """Apply ``func`` to every item on a thread pool, preserving input order."""
+    items = list(items)
+    if not items:
+        return []
+    with ThreadPoolExecutor(max_workers=min(_BATCH_WORKERS, len(items))) as pool:
+        return list(pool.map(func, items))
+
+
+# Runs single sub-requests issued from inside a tool, never whole tool calls.
+# It is separate from the batch pools so a full batch can't deadlock waiting
+# on its own sub-requests.
+_EXEC = ThreadPoolExecutor(max_workers=8)
+atexit.register(_EXEC.shutdown, wait=False)
+
+
+APPROVED_LICENSES: frozenset[str] = frozenset({
     "MIT",
     "ISC",
     "BSD-2-Clause",
     "BSD-3-Clause",
     "Apache-2.0",
     "MPL-2.0",
-]
+})
+
+
+class _LookupFailed(Exception):
+    """Raised inside cached lookups so lru_cache does not memoize a failure."""
+
+
+@functools.lru_cache(maxsize=512)
+def _fetch_license_via_api(group: str, artifact: str, version: str) -> str:
+    # A published (group, artifact, version) never changes its license, so
+    # successful lookups are cached for the life of the process.
+    api_key = os.getenv("LIBRARIES_IO_API_KEY")
+    if not api_key:
+        logging.warning("LIBRARIES_IO_API_KEY is not set")
+        raise _LookupFailed
+    url = f"https://libraries.io/api/Maven/{group}:{artifact}/{version}?api_key={api_key}"
+    resp = _SESSION.get(url, timeout=10)
+    if resp.status_code == 200:
+        data = _json_loads(resp.content)
+        return data.get("normalized_licenses") or data.get("licenses") or "Unknown"
+    logging.error("Libraries.io request failed: %s", resp.status_code)
+    raise _LookupFailed
+
+
+def _license_via_api(group: str, artifact: str, version: str) -> str:
+    try:
+        return _fetch_license_via_api(group, artifact, version)
+    except _LookupFailed:
+        return "Unknown"
+    except (requests.exceptions.RequestException, ValueError) as e:
+        # Contained per artifact so one bad lookup can't sink a whole batch
+        logging.error("Libraries.io request failed for %s:%s:%s: %s", group, artifact, version, e)
+        return "Unknown"
+
 
 @tool(name="libraries_io_license", description="Look up a dependency license using Libraries.io API")
 def fetch_license_via_api(group: str, artifact: str, version: str) -> str:
@@ -30,17 +168,51 @@ def fetch_license_via_api(group: str, artifact: str, version: str) -> str:
     Returns:
         str: The normalized license name or 'Unknown' if the license can't be determined
     """
-    api_key = os.getenv("LIBRARIES_IO_API_KEY")
-    if not api_key:
-        logging.warning("LIBRARIES_IO_API_KEY is not set")
-        return "Unknown"
-    url = f"https://libraries.io/api/Maven/{group}:{artifact}/{version}?api_key={api_key}"
-    resp = requests.get(url, timeout=10)
+    return _license_via_api(group, artifact, version)
+
+
+def fetch_licenses_via_api(coordinates: list[tuple[str, str, str]]) -> list:
+    """Look up the licenses of many Maven artifacts concurrently.
+
+    Args:
+        coordinates: (group, artifact, version) tuples to look up
+
+    Returns:
+        list: The result of fetch_license_via_api for each coordinate, in input order
+    """
+    return _map_concurrently(lambda c: _license_via_api(*c), coordinates)
+
+
+def _fetch_spdx_uncached(license_name: str) -> str:
+    url = f"https://raw.githubusercontent.com/spdx/license-list-data/main/text/{license_name}.txt"
+    resp = _SESSION.get(url, timeout=10)
     if resp.status_code == 200:
-        data = resp.json()
-        return data.get("normalized_licenses") or data.get("licenses") or "Unknown"
-    logging.error("Libraries.io request failed: %s", resp.status_code)
-    return "Unknown"
+        return resp.text
+    raise _LookupFailed
+
+
+@functools.lru_cache(maxsize=512)
+def _spdx_text(license_name: str) -> str:
+    # SPDX texts are immutable per identifier: serve from memory, then from
+    # the on-disk cache, and only go to the network on a cold miss.
+    if not _SPDX_ID_RE.match(license_name):
+        return _fetch_spdx_uncached(license_name)
+    path = _SPDX_CACHE_DIR / f"{license_name}.txt"
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+    text = _fetch_spdx_uncached(license_name)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=path.parent, delete=False
+        ) as tmp:
+            tmp.write(text)
+        os.replace(tmp.name, path)
+    except OSError as exc:
+        logging.debug("Could not cache SPDX text for %s: %s", license_name, exc)
+    return text
 
 
 @tool(name="lookup_license_text", description="Retrieve license text from SPDX list")
@@ -55,12 +227,11 @@ def lookup_license_text(license_name: str) -> str:
     Returns:
         str: The full text of the license, or empty string if not found
     """
-    url = f"https://raw.githubusercontent.com/spdx/license-list-data/main/text/{license_name}.txt"
-    resp = requests.get(url, timeout=10)
-    if resp.status_code == 200:
-        return resp.text
-    logging.warning("Could not fetch SPDX text for %s", license_name)
-    return ""
+    try:
+        return _spdx_text(license_name.strip())
+    except _LookupFailed:
+        logging.warning("Could not fetch SPDX text for %s", license_name)
+        return ""
 
 
 @tool(name="fetch_repo_license", description="Download LICENSE file from a URL")
@@ -78,47 +249,236 @@ def fetch_license_from_repo(url: str) -> str:
     if not url:
         return ""
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            return resp.text
+        # Stream so a misconfigured URL pointing at something huge is cut off
+        # at _MAX_LICENSE_BYTES instead of being read fully into memory.
+        with _SESSION.get(url, timeout=10, stream=True) as resp:
+            if resp.status_code == 200:
+                chunks = []
+                total = 0
+                for chunk in resp.iter_content(chunk_size=64 * 1024):
+                    chunks.append(chunk)
+                    total += len(chunk)
+                    if total > _MAX_LICENSE_BYTES:
+                        logging.warning("License at %s exceeds %d bytes, truncating", url, _MAX_LICENSE_BYTES)
+                        break
+                body = b"".join(chunks)[:_MAX_LICENSE_BYTES]
+                return body.decode(resp.encoding or "utf-8", errors="replace")
     except Exception as exc:
         logging.error("Failed to fetch license from %s: %s", url, exc)
     return ""
 
 
-@tool(name="search_license_issues", description="Search GitHub for a package and find its license")
-def search_license_issues(package_name: str) -> str:
-    """This tool searches GitHub for a package and attempts to find its license information.
-    It requires a GitHub API token set in the GITHUB_TOKEN environment variable.
-    First searches for repositories matching the package name, then:
-    1. Tries to get license information using GitHub's license API
-    2. Falls back to searching for LICENSE/COPYING files in the repository
+_GITHUB_GRAPHQL_URL = "https://api.github.com/graphql"
 
-    Args:
-        package_name: The name of the package to search for on GitHub
+# Search, license and root listing for the top hit in a single round trip.
+_LICENSE_QUERY = """
+query($q: String!) {
+  search(query: $q, type: REPOSITORY, first: 1) {
+    nodes {
+      ... on Repository {
+        nameWithOwner
+        licenseInfo { spdxId }
+        object(expression: "HEAD:") { ... on Tree { entries { name type } } }
+      }
+    }
+  }
+}
+"""
 
-    Returns:
-        str: A message containing either:
-            - The found license information (e.g., "Found license for owner/repo: MIT")
-            - List of found license files
-            - Error message if no license is found or an error occurs
+
+class GitHubRateLimitError(requests.exceptions.RequestException):
+    """Raised instead of calling GitHub while a rate-limit budget is spent."""
+
+
+# Epoch time at which each GitHub rate-limit resource ("core", "search",
+# "graphql") is usable again. Shared by all tools so none of them spends a
+# round trip on a request that is certain to be rejected.
+_GITHUB_RESET_AT: dict[str, float] = {}
+
+# (url, Authorization) -> (ETag, body) of 200 responses for conditional GETs,
+# oldest first.
+_ETAG_CACHE: dict[tuple[str, str | None], tuple[str, bytes]] = {}
+_ETAG_CACHE_SIZE = 512
+_ETAG_LOCK = threading.Lock()
+
+
+class _RevalidatedResponse(NamedTuple):
+    """A cached 200 body confirmed by a 304, with the 304's fresh headers."""
+
+    status_code: int
+    content: bytes
+    headers: Mapping[str, str]
+
+
+def _github_resource(url: str) -> str:
+    path = urlsplit(url).path
+    if path.startswith("/search/"):
+        return "search"
+    if path == "/graphql":
+        return "graphql"
+    return "core"
+
+
+# Matches the GitHub adapter's Retry: 5xx only, never 429 or 403.
+_GITHUB_RETRY_STATUSES = frozenset({500, 502, 503, 504})
+_GITHUB_RETRIES = 3
+
+
+def _send_github(method: str, url: str, **kwargs):
+    if _GITHUB_CLIENT is None:
+        return _SESSION.request(method, url, timeout=10, **kwargs)
+    # httpx only retries failed connections, so status retries with the same
+    # backoff as urllib3 (0.3s, 0.6s, 1.2s) are done here.
+    for attempt in range(_GITHUB_RETRIES + 1):
+        if attempt:
+            time.sleep(0.3 * 2 ** (attempt - 1))
+        try:
+            resp = _GITHUB_CLIENT.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            # Keep callers on the single requests exception hierarchy
+            raise requests.exceptions.RequestException(str(exc)) from exc
+        if resp.status_code not in _GITHUB_RETRY_STATUSES:
+            break
+    return resp
+
+
+def _record_github_budget(resource: str, resp) -> None:
+    if resp.headers.get("X-RateLimit-Remaining") == "0":
+        reset_at = float(resp.headers.get("X-RateLimit-Reset", 0))
+    elif resp.status_code in (403, 429) and "Retry-After" in resp.headers:
+        reset_at = time.time() + float(resp.headers["Retry-After"])
+    else:
+        return
+
+    _GITHUB_RESET_AT[resource] = reset_at
+    if resp.status_code in (403, 429):
+        raise GitHubRateLimitError(f"GitHub {resource} rate limit exceeded until {time.ctime(reset_at)}")
+    # Otherwise the budget ran out on this call, but its response is still good
+
+
+def _github_request(method: str, url: str, **kwargs):
+    """Send a GitHub API request, short-circuiting while its budget is exhausted.
+
+    The bodies of GET responses carrying an ETag are kept, and repeat requests
+    are sent as conditional GETs; a 304 costs no rate limit and is answered
+    with the kept body.
     """
+    resource = _github_resource(url)
+    reset_at = _GITHUB_RESET_AT.get(resource, 0.0)
+    if time.time() < reset_at:
+        raise GitHubRateLimitError(f"GitHub {resource} rate limit exhausted until {time.ctime(reset_at)}")
+
+    cache_key = cached = None
+    if method == "GET":
+        headers = dict(kwargs.pop("headers", None) or {})
+        # Different tokens can see different results, so the token is part of the key
+        cache_key = (url, headers.get("Authorization"))
+        cached = _ETAG_CACHE.get(cache_key)
+        if cached is not None:
+            headers["If-None-Match"] = cached[0]
+        kwargs["headers"] = headers
+
+    resp = _send_github(method, url, **kwargs)
+    _record_github_budget(resource, resp)
+    if cache_key is None:
+        return resp
+    if resp.status_code == 304 and cached is not None:
+        return _RevalidatedResponse(200, cached[1], resp.headers)
+    etag = resp.headers.get("ETag")
+    if resp.status_code == 200 and etag:
+        with _ETAG_LOCK:
+            _ETAG_CACHE[cache_key] = (etag, resp.content)
+            if len(_ETAG_CACHE) > _ETAG_CACHE_SIZE:
+                del _ETAG_CACHE[next(iter(_ETAG_CACHE))]
+    return resp
+
+
+# LICENSE, LICENCE.md, COPYING.LESSER, NOTICE, LICENSE-MIT, LICENSE2, UNLICENSE,
+# MIT-LICENSE, gpl-license.txt, ... but not licensed_to_kill.md
+_LICENSE_RE = re.compile(
+    r"^(?:[\w.]+[-_.])?(?:un)?(?:licen[cs]e|copying|notice)\d*(?:[-_.]|$)", re.IGNORECASE
+)
+
+
+def _license_files(names) -> list[str]:
+    return [name for name in names if _LICENSE_RE.match(name)]
+
+
+def _search_license_graphql(package_name: str, headers: dict) -> str | None:
+    """Answer a license search with one GraphQL query, or None to fall back to REST."""
+    resp = _github_request(
+        "POST",
+        _GITHUB_GRAPHQL_URL,
+        json={"query": _LICENSE_QUERY, "variables": {"q": package_name}},
+        headers=headers,
+    )
+    if resp.status_code != 200:
+        logging.info("GitHub GraphQL unavailable (%s), falling back to REST", resp.status_code)
+        return None
+    payload = _json_loads(resp.content)
+    if payload.get("errors") or not payload.get("data"):
+        logging.info("GitHub GraphQL returned errors, falling back to REST: %s", payload.get("errors"))
+        return None
+
+    repos = payload["data"]["search"]["nodes"]
+    if not repos:
+        return f"No repositories found for {package_name}"
+
+    repo = repos[0]
+    repo_full_name = repo["nameWithOwner"]
+    if repo.get("licenseInfo"):
+        return f"Found license for {repo_full_name}: {repo['licenseInfo']['spdxId']}"
+
+    # An empty repository has no HEAD tree
+    tree = repo.get("object") or {}
+    entries = tree.get("entries", [])
+    license_files = _license_files(e["name"] for e in entries if e["type"] == "blob")
+    if license_files:
+        return f"Found potential license file(s) in {repo_full_name}: {', '.join(license_files)}"
+    return f"No license information found for {repo_full_name}"
+
+
+def _github_headers(github_token: str) -> dict:
+    return {
+        "Authorization": f"token {github_token}",
+        "Accept": "application/vnd.github.v3+json"
+    }
+
+
+def _repo_license_files(repo_full_name: str, github_token: str) -> tuple[str, ...]:
+    # The git tree lists only path/type per root entry, a fraction of the
+    # /contents payload. Repeat lookups are conditional GETs through the ETag
+    # cache in _github_request, so a changed tree is never served stale.
+    tree_url = f"https://api.github.com/repos/{repo_full_name}/git/trees/HEAD"
+    resp = _github_request("GET", tree_url, headers=_github_headers(github_token))
+    if resp.status_code != 200:
+        raise _LookupFailed
+    tree = _json_loads(resp.content)["tree"]
+    return tuple(_license_files(e["path"] for e in tree if e["type"] == "blob"))
+
+
+def _search_license(package_name: str) -> str:
     github_token = os.getenv("GITHUB_TOKEN")
     if not github_token:
         logging.warning("GITHUB_TOKEN is not set")
         return "Could not search: GitHub token not configured"
 
-    headers = {
-        "Authorization": f"token {github_token}",
-        "Accept": "application/vnd.github.v3+json"
-    }
+    headers = _github_headers(github_token)
+
+    try:
+        message = _search_license_graphql(package_name, headers)
+        if message is not None:
+            return message
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.info("GitHub GraphQL request failed, falling back to REST: %s", e)
 
     # Search for the repository
     search_url = f"https://api.github.com/search/repositories?q={package_name}"
     try:
-        search_resp = requests.get(search_url, headers=headers, timeout=10)
-        search_resp.raise_for_status()
-        repos = search_resp.json().get("items", [])
+        search_resp = _github_request("GET", search_url, headers=headers)
+        if search_resp.status_code != 200:
+            raise requests.exceptions.HTTPError(f"{search_resp.status_code} Error for url: {search_url}")
+        repos = _json_loads(search_resp.content).get("items", [])
 
         if not repos:
             return f"No repositories found for {package_name}"
@@ -127,53 +487,175 @@ def search_license_issues(package_name: str) -> str:
         repo = repos[0]
         repo_full_name = repo["full_name"]
 
-        # Get repository license info
+        # The search hit already says whether GitHub detected a license. Only
+        # when it didn't is the root listing likely to be needed, so only then
+        # is it requested in the background while the license call runs. That
+        # saves a round trip on the fallback path, at the cost of one core
+        # rate-limit unit whenever the license API answers after all.
         license_url = f"https://api.github.com/repos/{repo_full_name}/license"
-        license_resp = requests.get(license_url, headers=headers, timeout=10)
+        files_fut = None
+        if not repo.get("license"):
+            files_fut = _EXEC.submit(_repo_license_files, repo_full_name, github_token)
+        try:
+            license_resp = _github_request("GET", license_url, headers=headers)
+
+            if license_resp.status_code == 200:
+                license_info = _json_loads(license_resp.content)
+                return f"Found license for {repo_full_name}: {license_info['license']['spdx_id']}"
+
+            # Try to find a LICENSE file directly
+            try:
+                if files_fut is not None:
+                    license_files = files_fut.result()
+                else:
+                    license_files = _repo_license_files(repo_full_name, github_token)
+            except _LookupFailed:
+                license_files = ()
+        finally:
+            if files_fut is not None:
+                files_fut.cancel()
+
+        if license_files:
+            return f"Found potential license file(s) in {repo_full_name}: {', '.join(license_files)}"
+
+        return f"No license information found for {repo_full_name}"
+
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logging.error("GitHub API request failed: %s", e)
+        return f"Error searching for license: {str(e)}"
 
-        if license_resp.status_code == 200:
-            license_info = license_resp.json()
-            return f"Found license for {repo_full_name}: {license_info['license']['spdx_id']}"
-        else:
-            # Try to fetch LICENSE file directly
-            contents_url = f"https://api.github.com/repos/{repo_full_name}/contents"
-            contents_resp = requests.get(contents_url, headers=headers, timeout=10)
 
-            if contents_resp.status_code == 200:
-                files = [f["name"].lower() for f in contents_resp.json()]
-                license_files = [f for f in files if "license" in f or "copying" in f]
+@tool(name="search_license_issues", description="Search GitHub for a package and find its license")
+def search_license_issues(package_name: str) -> str:
+    """This tool searches GitHub for a package and attempts to find its license information.
+    It requires a GitHub API token set in the GITHUB_TOKEN environment variable.
+    Searches for repositories matching the package name, then for the top match:
+    1. Tries to get license information using GitHub's license API
+    2. Falls back to searching for LICENSE/COPYING files in the repository
+    Both steps are answered by a single GraphQL query when the token allows it,
+    otherwise by the REST API.
 
-                if license_files:
-                    return f"Found potential license file(s) in {repo_full_name}: {', '.join(license_files)}"
+    Args:
+        package_name: The name of the package to search for on GitHub
 
-            return f"No license information found for {repo_full_name}"
+    Returns:
+        str: A message containing either:
+            - The found license information (e.g., "Found license for owner/repo: MIT")
+            - List of found license files
+            - Error message if no license is found or an error occurs
+    """
+    return _search_license(package_name)
 
-    except requests.exceptions.RequestException as e:
-        logging.error("GitHub API request failed: %s", e)
-        return f"Error searching for license: {str(e)}"
 
+def search_license_issues_batch(packages: list[str]) -> list[str]:
+    """Search GitHub for the licenses of many packages concurrently.
 
-def analyze_license_text(text: str) -> str:
-    """This tool uses Google's Gemini LLM to analyze license texts for unusual or concerning clauses.
-    It evaluates the license against common software license patterns and identifies any
-    non-standard, restrictive, or potentially problematic clauses. Requires a Google API key
-    set in the GOOGLE_API_KEY environment variable.
+    At most _BATCH_WORKERS searches are in flight at once to stay clear of
+    GitHub's secondary rate limits.
 
     Args:
-        text: The complete text of the license to analyze
+        packages: The package names to search for on GitHub
 
     Returns:
-        str: Either 'OK' if the license contains only standard permissive clauses,
-             or 'Unusual clause detected: <explanation>' if any concerning clauses are found,
-             or an error message if analysis fails
+        list[str]: The search_license_issues message for each package, in input order
     """
-    api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key:
-        logging.warning("GOOGLE_API_KEY not set")
-        return "Could not analyze: Google API key not configured"
+    return _map_concurrently(_search_license, packages)
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# The placeholder tokens the SPDX texts use where a project fills in its own
+# copyright details.
+_SPDX_PLACEHOLDERS = {
+    "<year>": "0000",
+    "<copyright holders>": "holders",
+    "<copyright holder>": "holder",
+    "<owner>": "owner",
+}
+_SPDX_PLACEHOLDER_RE = re.compile("|".join(map(re.escape, _SPDX_PLACEHOLDERS)), re.IGNORECASE)
+# A plain "Copyright (c) 2004-2010 Holder" notice. Any wording that could
+# carry a term (may, use, license, ...) keeps the line in the fingerprint.
+_COPYRIGHT_LINE_RE = re.compile(
+    r"^copyright\s+(\(c\)|©)?\s*[\d\s,\-]+"
+    r"(?!.*\b(may|must|shall|not|no|use[sd]?|only|except|without|commercial\w*"
+    r"|licen[cs]\w*|permi\w+|prohibit\w*|forbid\w*|revoke?\w*|restrict\w*)\b).*$",
+    re.IGNORECASE,
+)
+_MAX_COPYRIGHT_LINE = 100
+_RIGHTS_RESERVED_RE = re.compile(r"^all rights reserved\.?$", re.IGNORECASE)
+
+
+def _canonical_lines(text: str) -> list[str]:
+    """Lowercased, whitespace-collapsed lines of ``text`` minus copyright notices.
+
+    Only lines that are wholly a copyright notice or "All rights reserved"
+    are dropped; every other line, however short, stays and is compared.
+    """
+    lines = []
+    for line in text.splitlines():
+        line = _SPDX_PLACEHOLDER_RE.sub(lambda m: _SPDX_PLACEHOLDERS[m.group(0).lower()], line)
+        line = _WHITESPACE_RE.sub(" ", line).strip()
+        if not line or _RIGHTS_RESERVED_RE.match(line):
+            continue
+        if len(line) <= _MAX_COPYRIGHT_LINE and _COPYRIGHT_LINE_RE.match(line):
+            continue
+        lines.append(line.lower())
+    return lines
+
+
+def _fingerprint(lines: list[str]) -> bytes:
+    return hashlib.sha256(" ".join(lines).encode("utf-8")).digest()
+
+
+def _spdx_title(lines: list[str]) -> str | None:
+    # Most SPDX texts open with a bare title ("MIT License"); BSD-2-Clause
+    # and others start straight with their terms.
+    if lines and len(lines[0]) <= 60 and "licen" in lines[0]:
+        return lines[0]
+    return None
+
+
+@functools.lru_cache(maxsize=1)
+def _approved_fingerprints() -> tuple[frozenset[str], frozenset[bytes]]:
+    """The titles and title-less fingerprints of the approved SPDX texts."""
+    # Built on first use rather than at import so loading the tools never
+    # touches the network. If any approved text can't be fetched this raises
+    # _LookupFailed, which lru_cache doesn't store, so the next call retries.
+    titles = set()
+    fingerprints = set()
+    for text in _map_concurrently(_spdx_text, APPROVED_LICENSES):
+        lines = _canonical_lines(text)
+        title = _spdx_title(lines)
+        if title is not None:
+            titles.add(title)
+            lines = lines[1:]
+        fingerprints.add(_fingerprint(lines))
+    return frozenset(titles), frozenset(fingerprints)
+
+
+def _matches_approved_text(text: str) -> bool:
+    titles, fingerprints = _approved_fingerprints()
+    lines = _canonical_lines(text)
+    # Projects often drop the title, so it is optional, but only the exact
+    # title of an approved SPDX text may be skipped.
+    if lines and lines[0] in titles:
+        lines = lines[1:]
+    return _fingerprint(lines) in fingerprints
+
+
+@functools.lru_cache(maxsize=1)
+def _model(api_key: str):
+    # Keyed on the API key so a rotated GOOGLE_API_KEY gets a fresh client.
+    # Imported here because google.generativeai pulls in grpc and protobuf,
+    # which tools that never reach Gemini shouldn't pay for at import.
+    import google.generativeai as genai
 
     genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-pro')
 
+
+@functools.lru_cache(maxsize=256)
+def _llm_verdict(api_key: str, text: str) -> str:
+    # Repeated texts reuse the earlier verdict; failures raise and are not cached.
     prompt = (
         "You are an expert license auditor analyzing software licenses. "
         "Review the following license text carefully. "
@@ -189,11 +671,38 @@ def analyze_license_text(text: str) -> str:
         "License text to analyze:\n"
         f"{text}"
     )
+    return _model(api_key).generate_content(prompt).text.strip()
+
 
+def analyze_license_text(text: str) -> str:
+    """This tool uses Google's Gemini LLM to analyze license texts for unusual or concerning clauses.
+    It evaluates the license against common software license patterns and identifies any
+    non-standard, restrictive, or potentially problematic clauses. Requires a Google API key
+    set in the GOOGLE_API_KEY environment variable.
+
+    Args:
+        text: The complete text of the license to analyze
+
+    Returns:
+        str: Either 'OK' if the license contains only standard permissive clauses,
+             or 'Unusual clause detected: <explanation>' if any concerning clauses are found,
+             or an error message if analysis fails
+    """
+    # A verbatim copy of an approved SPDX text needs no LLM review
     try:
-        model = genai.GenerativeModel('gemini-pro')
-        response = model.generate_content(prompt)
-        return response.text.strip()
+        if _matches_approved_text(text):
+            return "OK"
+    except (_LookupFailed, requests.exceptions.RequestException):
+        logging.info("Approved SPDX texts unavailable, analyzing with Gemini")
+
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        logging.warning("GOOGLE_API_KEY not set")
+        return "Could not analyze: Google API key not configured"
+
+    try:
+        return _llm_verdict(api_key, text)
     except Exception as e:
         logging.error("License analysis failed: %s", e)
         return f"Error analyzing license: {str(e)}"
+